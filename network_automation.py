@@ -20,6 +20,11 @@ v1.3 - Integrated WebEx Teams notifications (Henrick - feature/webex-integration
 v2.0 - Added proper error handling for YANG model compatibility (Jose - bugfix/yang-errors branch)
 v2.1 - Fixed WebEx 204 status code validation (Via Mae - bugfix/webex-response branch)
 v2.2 - Final production version with all features integrated (main branch)
+v2.3 - Buffered structured event log with console/JSON formatters (feature/event-log branch)
+v2.4 - Connection retries with backoff, circuit breaker and transparent reconnect (feature/resilient-connection branch)
+v2.5 - Operational state polling with delta-encoded interface telemetry (feature/interface-telemetry branch)
+v2.6 - Fleet compliance report built from cached per-snapshot interface indexes (feature/compliance-report branch)
+v2.7 - Per-device change queue merging operators' requests into one commit (feature/change-queue branch)
 
 YANG Model Used: Cisco-IOS-XR-ifmgr-cfg (Cisco IOS XR Interface Manager Configuration)
 
@@ -30,12 +35,33 @@ Phase 3: End-to-end validation with WebEx notifications (Via Mae)
 """
 
 from ncclient import manager
+from ncclient.operations.errors import TimeoutExpiredError
+from ncclient.transport.errors import TransportError
 import xmltodict
 import json
 import requests
 from datetime import datetime
 import os
 import glob
+import atexit
+import csv
+import getpass
+import hmac
+import html
+import ipaddress
+import logging
+import logging.handlers
+import queue
+import random
+import re
+import socket
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
 # ============ CONFIGURATION ============
 # Device credentials (DevNet IOS XR Sandbox)
@@ -52,6 +78,61 @@ WEBEX_WEBHOOK = "https://webexapis.com/v1/webhooks/incoming/Y2lzY29zcGFyazovL3Vy
 # Interface to modify (common IOS XR interface)
 INTERFACE_NAME = "GigabitEthernet0/0/0/0"
 
+# ============ LOGGING ============
+# Every message is a structured event written by a background thread.
+# LOG_LEVEL 'DEBUG' also includes the full XML replies from the device.
+LOG_LEVEL = 'INFO'
+# 'console' = human-readable lines, 'json' = one compact JSON event per line
+LOG_FORMAT = 'console'
+# Optional file that receives the JSON event stream in addition to stdout
+LOG_FILE = None
+
+# ============ CONNECTION SETTINGS ============
+CONNECT_TIMEOUT = 10      # seconds for the SSH/NETCONF handshake
+RPC_TIMEOUT = 30          # seconds to wait for each RPC reply
+CONNECT_RETRIES = 3       # extra connection attempts after the first one
+CONNECT_BUDGET = 30       # seconds all connection attempts together may take
+READ_RETRIES = 2          # extra attempts for get/get_config after a dropped session
+RETRY_BASE_DELAY = 1.0    # seconds, doubled on every attempt (with jitter)
+RETRY_MAX_DELAY = 15.0    # upper bound for a single backoff sleep
+# Circuit breaker: after this many consecutive failed connects (runs) a device
+# is skipped for CIRCUIT_COOLDOWN seconds instead of burning a timeout on every run
+CIRCUIT_FAILURE_THRESHOLD = 3
+CIRCUIT_COOLDOWN = 300
+# Breaker state is kept here so it survives between runs (None = memory only)
+CIRCUIT_STATE_FILE = 'circuit_breakers.json'
+
+# ============ TELEMETRY SETTINGS ============
+TELEMETRY_INTERVAL = 10   # seconds between operational state polls
+TELEMETRY_HISTORY = 1000  # delta records kept per device (ring buffer)
+TELEMETRY_KEYFRAME_EVERY = 50  # records per interface between absolute keyframes
+TELEMETRY_WORKERS = 20    # devices polled in parallel
+# After enabling the interface, wait up to this long for it to come up and
+# pass traffic (0 skips the check)
+VERIFY_OPER_TIMEOUT = 20
+
+# ============ COMPLIANCE REPORT SETTINGS ============
+SNAPSHOT_DIR = 'snapshots'                 # one <device>.xml running config per device
+REPORT_CACHE = 'compliance_cache.json'     # parsed interface index per snapshot
+COMPLIANCE_MTUS = (1500,)                  # explicitly configured MTUs that are allowed
+# Shutdown is expected on interfaces whose description matches this pattern
+COMPLIANCE_SHUTDOWN_OK = r'(?i)unused|spare|reserved|decom'
+REPORT_WORKERS = None                      # process pool size (None = CPU count)
+
+# ============ CHANGE QUEUE SETTINGS ============
+# Start the service with: python network_automation.py serve-queue
+# Use '0.0.0.0' so operators on other hosts can reach it (requires a token)
+CHANGE_QUEUE_HOST = '127.0.0.1'
+CHANGE_QUEUE_PORT = 8830
+# Set to e.g. 'http://queue-host:8830' to send changes through the queue service
+# instead of committing them from this session
+CHANGE_QUEUE_URL = None
+# Shared secret sent as 'Authorization: Bearer <token>' - set the same
+# CHANGE_QUEUE_TOKEN environment variable on the service and every client
+CHANGE_QUEUE_TOKEN = os.environ.get('CHANGE_QUEUE_TOKEN')
+CHANGE_MERGE_WINDOW = 2.0   # seconds to collect requests for the same device
+CHANGE_RESULT_TIMEOUT = 300  # seconds a client waits for its result
+
 # ============ NETCONF FILTER (YANG Model) ============
 # This uses the Cisco IOS XR native YANG model
 interface_filter = f"""
@@ -76,10 +157,430 @@ ietf_interface_filter = f"""
 </filter>
 """
 
+# ============ EVENT LOG ============
+
+logger = logging.getLogger('network_automation')
+_log_queue = queue.Queue()
+_log_listener = None
+# Guards starting/stopping the listener: two listeners on one queue steal
+# each other's stop sentinel and hang shutdown
+_log_lock = threading.RLock()
+
+
+class JsonEventFormatter(logging.Formatter):
+    """Render a log record as one compact JSON event"""
+
+    def format(self, record):
+        event = {
+            'ts': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'event': getattr(record, 'event', 'log'),
+        }
+        event.update(getattr(record, 'fields', {}))
+        message = record.getMessage().strip()
+        # XML events already carry the full reply; the console rendering is redundant
+        if message and 'xml' not in event:
+            event['msg'] = message
+        return json.dumps(event, separators=(',', ':'), default=str)
+
+
+class ConsoleFormatter(logging.Formatter):
+    """Render a log record as the human-readable console text"""
+
+    def format(self, record):
+        return record.getMessage()
+
+
+class BufferedStreamHandler(logging.StreamHandler):
+    """StreamHandler that only flushes once the event queue has drained"""
+
+    def emit(self, record):
+        try:
+            self.stream.write(self.format(record) + self.terminator)
+            if _log_queue.empty():
+                self.flush()
+        except Exception:
+            self.handleError(record)
+
+
+def _setup_logging(level=None, log_format=None, log_file=None):
+    """
+    Route all events through a queue to a background writer thread.
+    Workers only pay for a queue put; formatting and stream I/O happen
+    on the listener thread, one whole record at a time, so multi-line
+    blocks from different devices never interleave.
+    """
+    global _log_listener
+
+    level = level or LOG_LEVEL
+    log_format = log_format or LOG_FORMAT
+    log_file = log_file if log_file is not None else LOG_FILE
+
+    _shutdown_logging()
+
+    # Redirected output gets a large buffer that is flushed when the queue
+    # drains, not per line. A terminal keeps sys.stdout so Python's console
+    # writer handles the encoding (✓/⚠/─ on Windows code-page consoles).
+    stdout = sys.stdout
+    try:
+        if not sys.stdout.isatty():
+            stdout = open(sys.stdout.fileno(), 'w', encoding=sys.stdout.encoding or 'utf-8',
+                          errors='replace', buffering=1 << 16, closefd=False)
+    except (AttributeError, OSError, ValueError):
+        stdout = sys.stdout
+    console_handler = BufferedStreamHandler(stdout)
+    console_handler.setFormatter(JsonEventFormatter() if log_format == 'json' else ConsoleFormatter())
+    handlers = [console_handler]
+
+    if log_file:
+        file_handler = BufferedStreamHandler(open(log_file, 'a', encoding='utf-8', buffering=1 << 16))
+        file_handler.setFormatter(JsonEventFormatter())
+        handlers.append(file_handler)
+
+    logger.handlers = [logging.handlers.QueueHandler(_log_queue)]
+    logger.setLevel(level)
+    logger.propagate = False
+
+    _log_listener = logging.handlers.QueueListener(_log_queue, *handlers)
+    _log_listener.start()
+
+
+def flush_logging():
+    """Block until every queued event has been written (call before input())"""
+    if _log_listener is None:
+        return
+    _log_queue.join()
+    for handler in _log_listener.handlers:
+        handler.flush()
+
+
+def _shutdown_logging():
+    global _log_listener
+
+    listener, _log_listener = _log_listener, None
+    if listener is None:
+        return
+    listener.stop()
+    for handler in listener.handlers:
+        try:
+            handler.flush()
+            if handler.stream not in (sys.stdout, sys.stderr):
+                handler.stream.close()
+        except (OSError, ValueError):
+            # stdout already closed (e.g. output piped into `head`)
+            pass
+
+
+def setup_logging(level=None, log_format=None, log_file=None):
+    """(Re)start the background event writer - safe to call from any thread"""
+    with _log_lock:
+        _setup_logging(level, log_format, log_file)
+
+
+def shutdown_logging():
+    """Drain the queue and stop the background writer"""
+    with _log_lock:
+        _shutdown_logging()
+
+
+atexit.register(shutdown_logging)
+
+
+def log_event(event, message='', level=logging.INFO, **fields):
+    """
+    Emit one structured event.
+    `message` is what the console formatter shows; `fields` end up as
+    keys in the JSON event. The device host is attached automatically.
+    """
+    if _log_listener is None:
+        with _log_lock:
+            # Re-check: another thread may have started it while we waited
+            if _log_listener is None:
+                _setup_logging()
+    if not logger.isEnabledFor(level):
+        return
+    fields.setdefault('device', DEVICE['host'])
+    logger.log(level, message, extra={'event': event, 'fields': fields})
+
+
+def _device_host(connection):
+    """Host a connection belongs to, used to tag its events"""
+    return getattr(connection, 'device', DEVICE)['host']
+
+
+def _clock():
+    """Current time in the HH:MM:SS format used by the console output"""
+    return datetime.now().strftime('%H:%M:%S')
+
+
+# ============ CONNECTION LAYER ============
+
+# Errors that mean the NETCONF session is gone (or the reply never came)
+SESSION_ERRORS = (TransportError, TimeoutExpiredError, EOFError, OSError)
+
+# RPCs that only read state and are therefore safe to resend
+IDEMPOTENT_RPCS = ('get_config', 'get')
+
+_circuit_breakers = {}
+_circuit_probing = set()
+_circuit_lock = threading.Lock()
+
+
+class CircuitOpenError(Exception):
+    """Raised when a device is skipped because its circuit breaker is open"""
+
+
+def _backoff_delay(attempt):
+    """Exponential backoff with full jitter for the given retry attempt (0-based)"""
+    return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt))
+
+
+def _load_circuit_breakers():
+    """Breaker state {host: {'failures', 'opened_at'}} from CIRCUIT_STATE_FILE or memory"""
+    if not CIRCUIT_STATE_FILE:
+        return _circuit_breakers
+    try:
+        with open(CIRCUIT_STATE_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _store_circuit_breakers(breakers):
+    """Persist breaker state atomically so concurrent runs never read half a file"""
+    if not CIRCUIT_STATE_FILE:
+        return
+    temp_path = f"{CIRCUIT_STATE_FILE}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(breakers, f)
+        os.replace(temp_path, CIRCUIT_STATE_FILE)
+    except OSError as e:
+        log_event('circuit.save_failed', f"⚠ Could not save circuit breaker state: {e}",
+                  logging.WARNING, file=CIRCUIT_STATE_FILE, error=str(e))
+
+
+def _circuit_check(host):
+    """
+    Raise CircuitOpenError while the breaker for `host` is open.
+    Once the cooldown has passed a single caller is let through as a probe
+    (half-open); everybody else keeps failing fast until the probe reports back.
+    """
+    with _circuit_lock:
+        breaker = _load_circuit_breakers().get(host)
+        if not breaker or breaker['failures'] < CIRCUIT_FAILURE_THRESHOLD:
+            return
+        # Wall-clock time, since the state outlives the process
+        remaining = breaker['opened_at'] + CIRCUIT_COOLDOWN - time.time()
+        if remaining > 0 or host in _circuit_probing:
+            raise CircuitOpenError(
+                f"circuit open for {host} after {breaker['failures']} failures "
+                f"(retry in {max(remaining, 0):.0f}s)")
+        _circuit_probing.add(host)
+
+
+def _circuit_record(host, success):
+    """Update the breaker for `host` with the result of a connection attempt"""
+    with _circuit_lock:
+        _circuit_probing.discard(host)
+        breakers = _load_circuit_breakers()
+        if success:
+            if breakers.pop(host, None) is not None:
+                _store_circuit_breakers(breakers)
+            return
+        breaker = breakers.setdefault(host, {'failures': 0, 'opened_at': 0.0})
+        breaker['failures'] += 1
+        if breaker['failures'] >= CIRCUIT_FAILURE_THRESHOLD:
+            breaker['opened_at'] = time.time()
+        _store_circuit_breakers(breakers)
+
+
+def _open_session(device, timeout=None):
+    """Single NETCONF connection attempt using the configured timeouts"""
+    session = manager.connect(
+        host=device['host'],
+        port=device['port'],
+        username=device['username'],
+        password=device['password'],
+        hostkey_verify=False,
+        device_params={'name': 'iosxr'},  # Changed to iosxr
+        look_for_keys=False,
+        allow_agent=False,
+        timeout=timeout or CONNECT_TIMEOUT
+    )
+    session.timeout = RPC_TIMEOUT
+    return session
+
+
+def _connect_with_retry(device):
+    """
+    Open a session with jittered exponential retry.
+    All attempts together stay within CONNECT_BUDGET seconds (the old
+    single 30s timeout), so retrying never makes a dead device slower.
+    Raises CircuitOpenError if the device is circuit-broken, otherwise the
+    last connection error once all attempts are used up. The breaker counts
+    one failure per exhausted call, not one per attempt.
+    """
+    host = device['host']
+    _circuit_check(host)
+    started = time.monotonic()
+    for attempt in range(CONNECT_RETRIES + 1):
+        remaining = CONNECT_BUDGET - (time.monotonic() - started)
+        try:
+            session = _open_session(device, timeout=max(1, min(CONNECT_TIMEOUT, remaining)))
+        except Exception as e:
+            delay = _backoff_delay(attempt)
+            remaining = CONNECT_BUDGET - (time.monotonic() - started)
+            if attempt == CONNECT_RETRIES or remaining - delay < 1:
+                _circuit_record(host, success=False)
+                raise
+            log_event('connect.retry',
+                      f"  ⚠ Attempt {attempt + 1} failed: {e} - retrying in {delay:.1f}s",
+                      logging.WARNING, device=host, attempt=attempt + 1, delay=round(delay, 2), error=str(e))
+            time.sleep(delay)
+            continue
+        _circuit_record(host, success=True)
+        return session
+
+
+class ResilientConnection:
+    """
+    Wraps an ncclient session for one device.
+    Reconnects transparently when the session has dropped and resends
+    idempotent reads (get/get_config) that fail mid-call. edit_config and
+    commit are never resent - the candidate datastore is per-session, so
+    commit() refuses to run on a different session than the one that took
+    the edit, and the half-applied edit is reported to the caller instead.
+    Any other attribute is passed straight through to the ncclient manager.
+    """
+
+    def __init__(self, device, session):
+        self.device = device
+        self._session = session
+        # Session holding uncommitted candidate changes, if any
+        self._edited_session = None
+
+    def __getattr__(self, name):
+        if name == '_session':
+            raise AttributeError(name)
+        return getattr(self._session, name)
+
+    def _reconnect(self):
+        old_session = self._session
+        if old_session.connected:
+            # e.g. an RPC timed out: the session is still up, so close it
+            # before opening a fresh one instead of leaking it
+            log_event('connect.reopen', f"  ⚠ Session to {self.device['host']} not responding - reopening...",
+                      logging.WARNING, device=self.device['host'])
+            try:
+                old_session.close_session()
+            except Exception:
+                pass
+        else:
+            log_event('connect.reconnect', f"  ⚠ Session to {self.device['host']} lost - reconnecting...",
+                      logging.WARNING, device=self.device['host'])
+        self._session = _connect_with_retry(self.device)
+
+    def _call(self, rpc, *args, **kwargs):
+        retries = READ_RETRIES if rpc in IDEMPOTENT_RPCS else 0
+        attempt = 0
+        while True:
+            if not self._session.connected:
+                self._reconnect()
+            try:
+                return getattr(self._session, rpc)(*args, **kwargs)
+            except SESSION_ERRORS as e:
+                if attempt >= retries:
+                    raise
+                delay = _backoff_delay(attempt)
+                log_event('rpc.retry', f"  ⚠ {rpc} failed: {e} - retrying in {delay:.1f}s",
+                          logging.WARNING, device=self.device['host'], rpc=rpc,
+                          attempt=attempt + 1, delay=round(delay, 2), error=str(e))
+                attempt += 1
+                time.sleep(delay)
+                self._reconnect()
+
+    def get_config(self, *args, **kwargs):
+        return self._call('get_config', *args, **kwargs)
+
+    def get(self, *args, **kwargs):
+        return self._call('get', *args, **kwargs)
+
+    def edit_config(self, *args, **kwargs):
+        reply = self._call('edit_config', *args, **kwargs)
+        self._edited_session = self._session
+        return reply
+
+    def commit(self, *args, **kwargs):
+        edited, self._edited_session = self._edited_session, None
+        # Never reconnect here: a fresh session has an empty candidate
+        if not self._session.connected or (edited is not None and edited is not self._session):
+            raise TransportError(f"session to {self.device['host']} dropped before commit - "
+                                 "candidate changes were lost")
+        return self._call('commit', *args, **kwargs)
+
+    def close_session(self):
+        if not self._session.connected:
+            return None
+        try:
+            return self._session.close_session()
+        except SESSION_ERRORS:
+            return None
+
+
 # ============ FUNCTIONS ============
 
-def extract_interface_values(config_xml):
-    """Extract current interface description, state, and MTU from config XML"""
+def _interface_blocks(config_xml):
+    """Return the body of every <interface-configuration> block in a config"""
+    # First try to find in the Cisco-IOS-XR-ifmgr-cfg namespace (the one we write to)
+    ifmgr_section = re.search(r'<interface-configurations xmlns="http://cisco.com/ns/yang/Cisco-IOS-XR-ifmgr-cfg">(.*?)</interface-configurations>', config_xml, re.DOTALL)
+
+    search_section = ifmgr_section.group(1) if ifmgr_section else config_xml
+
+    # Split into separate interface-configuration blocks
+    # This prevents matching across multiple interfaces
+    return re.findall(r'<interface-configuration>(.*?)</interface-configuration>', search_section, re.DOTALL)
+
+
+def _parse_interface_block(interface_section):
+    """
+    Parse one interface-configuration block into raw values:
+    {'description': str or None, 'shutdown': bool, 'mtu': int or None}
+    """
+    values = {'description': None, 'shutdown': False, 'mtu': None}
+
+    # Extract description
+    desc_match = re.search(r'<description>(.*?)</description>', interface_section, re.DOTALL)
+    if desc_match:
+        values['description'] = desc_match.group(1).strip()
+
+    # Check shutdown state
+    # If <shutdown></shutdown> or <shutdown/> exists, interface is disabled
+    # If no shutdown tag, interface is enabled
+    if '<shutdown>' in interface_section and '</shutdown>' in interface_section:
+        # Check if it's empty tag (means shutdown is configured)
+        shutdown_content = re.search(r'<shutdown>(.*?)</shutdown>', interface_section, re.DOTALL)
+        if shutdown_content:
+            # Empty content means shutdown is enabled
+            values['shutdown'] = not shutdown_content.group(1).strip()
+        else:
+            values['shutdown'] = True
+    elif '<shutdown/>' in interface_section:
+        values['shutdown'] = True
+
+    # Extract MTU
+    mtu_match = re.search(r'<mtu>(\d+)</mtu>', interface_section)
+    if mtu_match:
+        values['mtu'] = int(mtu_match.group(1))
+
+    return values
+
+
+def extract_interface_values(config_xml, device=None):
+    """
+    Extract current interface description, state, and MTU from config XML
+    `device` is the host the config came from (defaults to DEVICE)
+    """
     values = {
         'description': 'Not set',
         'state': 'Unknown',
@@ -90,63 +591,39 @@ def extract_interface_values(config_xml):
         return values
 
     try:
-        import re
-
-        # First try to find in the Cisco-IOS-XR-ifmgr-cfg namespace (the one we write to)
-        ifmgr_section = re.search(r'<interface-configurations xmlns="http://cisco.com/ns/yang/Cisco-IOS-XR-ifmgr-cfg">(.*?)</interface-configurations>', config_xml, re.DOTALL)
-
-        search_section = ifmgr_section.group(1) if ifmgr_section else config_xml
-
-        # Find ALL interface-configuration blocks and search for the one with our interface name
-        # This prevents matching across multiple interfaces
-        all_interfaces = re.findall(r'<interface-configuration>(.*?)</interface-configuration>', search_section, re.DOTALL)
-
         interface_section = None
-        for interface_block in all_interfaces:
+        for interface_block in _interface_blocks(config_xml):
             # Check if this block contains our interface name
             if f'<interface-name>{INTERFACE_NAME}</interface-name>' in interface_block:
                 interface_section = interface_block
                 break
 
         if interface_section:
-
-            # Extract description
-            desc_match = re.search(r'<description>(.*?)</description>', interface_section, re.DOTALL)
-            if desc_match:
-                values['description'] = desc_match.group(1).strip()
-
-            # Check shutdown state
-            # If <shutdown></shutdown> or <shutdown/> exists, interface is disabled
-            # If no shutdown tag, interface is enabled
-            if '<shutdown>' in interface_section and '</shutdown>' in interface_section:
-                # Check if it's empty tag (means shutdown is configured)
-                shutdown_content = re.search(r'<shutdown>(.*?)</shutdown>', interface_section, re.DOTALL)
-                if shutdown_content:
-                    content = shutdown_content.group(1).strip()
-                    # Empty content means shutdown is enabled
-                    if not content or content == '':
-                        values['state'] = 'Disabled (shutdown)'
-                    else:
-                        values['state'] = 'Enabled (no shutdown)'
-                else:
-                    values['state'] = 'Disabled (shutdown)'
-            elif '<shutdown/>' in interface_section:
-                values['state'] = 'Disabled (shutdown)'
-            else:
-                # No shutdown element means enabled
-                values['state'] = 'Enabled (no shutdown)'
-
-            # Extract MTU
-            mtu_match = re.search(r'<mtu>(\d+)</mtu>', interface_section)
-            if mtu_match:
-                values['mtu'] = mtu_match.group(1) + ' bytes'
+            parsed = _parse_interface_block(interface_section)
+            if parsed['description'] is not None:
+                values['description'] = parsed['description']
+            values['state'] = 'Disabled (shutdown)' if parsed['shutdown'] else 'Enabled (no shutdown)'
+            if parsed['mtu'] is not None:
+                values['mtu'] = f"{parsed['mtu']} bytes"
 
     except Exception as e:
-        print(f"  Note: Could not parse configuration values: {e}")
+        log_event('config.parse_error', f"  Note: Could not parse configuration values: {e}", logging.WARNING, error=str(e), device=device or DEVICE['host'])
 
     return values
 
 
+def index_interfaces(config_xml):
+    """Parse every interface in a config into {interface_name: raw values}"""
+    index = {}
+    if not config_xml:
+        return index
+    for interface_block in _interface_blocks(config_xml):
+        name_match = re.search(r'<interface-name>(.*?)</interface-name>', interface_block)
+        if name_match:
+            index[name_match.group(1).strip()] = _parse_interface_block(interface_block)
+    return index
+
+
 def get_last_run_info():
     """
     Retrieve and display information from the last program run
@@ -158,10 +635,10 @@ def get_last_run_info():
     if not backup_files:
         # Fall back to the standard config_before.xml if no timestamped backups exist
         if os.path.exists('config_before.xml'):
-            print("\n" + "="*70)
-            print("PREVIOUS RUN DETECTED")
-            print("="*70)
-            print("Found configuration from last run: config_before.xml")
+            header = ("\n" + "="*70 + "\n"
+                      "PREVIOUS RUN DETECTED\n" +
+                      "="*70 + "\n"
+                      "Found configuration from last run: config_before.xml")
 
             try:
                 with open('config_before.xml', 'r', encoding='utf-8') as f:
@@ -170,16 +647,22 @@ def get_last_run_info():
                 # Extract values from last run
                 last_values = extract_interface_values(last_config)
 
-                print("\nLast 'BEFORE' Configuration (from previous run):")
-                print(f"   Description: {last_values['description']}")
-                print(f"   State: {last_values['state']}")
-                print(f"   MTU: {last_values['mtu']}")
-                print("="*70 + "\n")
+                log_event('last_run.found',
+                          header + "\n"
+                          "\nLast 'BEFORE' Configuration (from previous run):\n"
+                          f"   Description: {last_values['description']}\n"
+                          f"   State: {last_values['state']}\n"
+                          f"   MTU: {last_values['mtu']}\n" +
+                          "="*70 + "\n",
+                          file='config_before.xml', **last_values)
 
                 return last_values
             except Exception as e:
-                print(f"   Note: Could not read last configuration: {e}")
-                print("="*70 + "\n")
+                log_event('last_run.unreadable',
+                          header + "\n"
+                          f"   Note: Could not read last configuration: {e}\n" +
+                          "="*70 + "\n",
+                          logging.WARNING, file='config_before.xml', error=str(e))
                 return None
         return None
 
@@ -190,11 +673,11 @@ def get_last_run_info():
     # Extract timestamp from filename
     timestamp_str = latest_backup.replace('config_before_', '').replace('.xml', '')
 
-    print("\n" + "="*70)
-    print("PREVIOUS RUN DETECTED")
-    print("="*70)
-    print(f"Found configuration from last run: {latest_backup}")
-    print(f"Timestamp: {timestamp_str}")
+    header = ("\n" + "="*70 + "\n"
+              "PREVIOUS RUN DETECTED\n" +
+              "="*70 + "\n"
+              f"Found configuration from last run: {latest_backup}\n"
+              f"Timestamp: {timestamp_str}")
 
     try:
         with open(latest_backup, 'r', encoding='utf-8') as f:
@@ -203,67 +686,79 @@ def get_last_run_info():
         # Extract values from last run
         last_values = extract_interface_values(last_config)
 
-        print("\nLast 'BEFORE' Configuration (from previous run):")
-        print(f"   Description: {last_values['description']}")
-        print(f"   State: {last_values['state']}")
-        print(f"   MTU: {last_values['mtu']}")
-        print("="*70 + "\n")
+        log_event('last_run.found',
+                  header + "\n"
+                  "\nLast 'BEFORE' Configuration (from previous run):\n"
+                  f"   Description: {last_values['description']}\n"
+                  f"   State: {last_values['state']}\n"
+                  f"   MTU: {last_values['mtu']}\n" +
+                  "="*70 + "\n",
+                  file=latest_backup, **last_values)
 
         return last_values
     except Exception as e:
-        print(f"   Note: Could not read last configuration: {e}")
-        print("="*70 + "\n")
+        log_event('last_run.unreadable',
+                  header + "\n"
+                  f"   Note: Could not read last configuration: {e}\n" +
+                  "="*70 + "\n",
+                  logging.WARNING, file=latest_backup, error=str(e))
         return None
 
 
-def connect_to_device():
-    """Establish NETCONF connection to network device"""
-    print(f"\n[{datetime.now().strftime('%H:%M:%S')}] Connecting to {DEVICE['host']}...")
+def connect_to_device(device=None):
+    """
+    Establish NETCONF connection to network device
+    Retries with jittered backoff and fails fast while the device's circuit
+    breaker is open. Returns a ResilientConnection, or None on failure.
+    """
+    device = device or DEVICE
+    log_event('connect.start', f"\n[{_clock()}] Connecting to {device['host']}...", device=device['host'])
     
     try:
-        connection = manager.connect(
-            host=DEVICE['host'],
-            port=DEVICE['port'],
-            username=DEVICE['username'],
-            password=DEVICE['password'],
-            hostkey_verify=False,
-            device_params={'name': 'iosxr'},  # Changed to iosxr
-            look_for_keys=False,
-            allow_agent=False,
-            timeout=30
-        )
-        print("✓ Connection successful!")
-        print(f"✓ Server capabilities: {len(connection.server_capabilities)} capabilities detected")
+        connection = ResilientConnection(device, _connect_with_retry(device))
+        capabilities = len(connection.server_capabilities)
+        log_event('connect.ok',
+                  "✓ Connection successful!\n"
+                  f"✓ Server capabilities: {capabilities} capabilities detected",
+                  device=device['host'], capabilities=capabilities)
         return connection
+    except CircuitOpenError as e:
+        log_event('connect.circuit_open', f"✗ Skipping device: {e}", logging.ERROR,
+                  device=device['host'], error=str(e))
+        return None
     except Exception as e:
-        print(f"✗ Connection failed: {e}")
+        log_event('connect.failed', f"✗ Connection failed: {e}", logging.ERROR,
+                  device=device['host'], error=str(e))
         return None
 
 
 def get_running_config(connection, save_as='running_config.xml', create_backup=False):
     """Retrieve current running configuration"""
-    print(f"\n[{datetime.now().strftime('%H:%M:%S')}] Retrieving running configuration...")
+    host = _device_host(connection)
+    log_event('running_config.start', f"\n[{_clock()}] Retrieving running configuration...", device=host)
 
     try:
         # Get the full running config
         response = connection.get_config(source='running')
 
-        # Parse and display
-        print("\n" + "="*70)
-        print("CURRENT RUNNING CONFIGURATION (Sample)")
-        print("="*70)
-
-        # Show first 2000 characters of config
-        config_preview = response.xml[:2000]
-        print(config_preview)
-        print("\n... (configuration truncated for display) ...")
-        print(f"Total config size: {len(response.xml)} characters")
-        print("="*70 + "\n")
+        # The XML sample is only rendered at DEBUG - the full reply goes
+        # into the JSON event, the console shows the first 2000 characters
+        log_event('running_config.xml',
+                  "\n" + "="*70 + "\n"
+                  "CURRENT RUNNING CONFIGURATION (Sample)\n" +
+                  "="*70 + "\n" +
+                  response.xml[:2000] + "\n"
+                  "\n... (configuration truncated for display) ...",
+                  logging.DEBUG, xml=response.xml, device=host)
+        log_event('running_config.ok',
+                  f"Total config size: {len(response.xml)} characters\n" +
+                  "="*70 + "\n",
+                  size=len(response.xml), device=host)
 
         # Save full config to file for review
-        print(f"Full configuration saved to: {save_as}")
         with open(save_as, 'w', encoding='utf-8') as f:
             f.write(response.xml)
+        log_event('running_config.saved', f"Full configuration saved to: {save_as}", file=save_as, device=host)
 
         # Create timestamped backup for history tracking
         if create_backup:
@@ -271,38 +766,46 @@ def get_running_config(connection, save_as='running_config.xml', create_backup=F
             backup_name = save_as.replace('.xml', f'_{timestamp}.xml')
             with open(backup_name, 'w', encoding='utf-8') as f:
                 f.write(response.xml)
-            print(f"Timestamped backup saved to: {backup_name}")
+            log_event('running_config.backup', f"Timestamped backup saved to: {backup_name}", file=backup_name, device=host)
 
         return response.xml
     except Exception as e:
-        print(f"✗ Failed to retrieve config: {e}")
+        log_event('running_config.failed', f"✗ Failed to retrieve config: {e}", logging.ERROR, error=str(e), device=host)
         return None
 
 
 def get_interface_config(connection):
     """Get specific interface configuration"""
-    print(f"\n[{datetime.now().strftime('%H:%M:%S')}] Retrieving interface configuration...")
+    host = _device_host(connection)
+    log_event('interface_config.start', f"\n[{_clock()}] Retrieving interface configuration...",
+              interface=INTERFACE_NAME, device=host)
     
     try:
         # Using Cisco IOS XR native model to match what we use for configuration
         response = connection.get_config(source='running', filter=('subtree', interface_filter))
         
-        print("\n" + "="*70)
-        print(f"INTERFACE CONFIGURATION: {INTERFACE_NAME}")
-        print("="*70)
-        print(response.xml)
-        print("="*70 + "\n")
+        # Full XML reply is only written at DEBUG
+        log_event('interface_config.xml',
+                  "\n" + "="*70 + "\n"
+                  f"INTERFACE CONFIGURATION: {INTERFACE_NAME}\n" +
+                  "="*70 + "\n" +
+                  response.xml + "\n" +
+                  "="*70 + "\n",
+                  logging.DEBUG, interface=INTERFACE_NAME, xml=response.xml, device=host)
         
         return response.xml
     except Exception as e:
-        print(f"⚠ Could not retrieve interface config: {e}")
-        print("Attempting alternative method...")
+        log_event('interface_config.failed',
+                  f"⚠ Could not retrieve interface config: {e}\n"
+                  "Attempting alternative method...",
+                  logging.WARNING, interface=INTERFACE_NAME, error=str(e), device=host)
         try:
             # Try IETF model as fallback
             response = connection.get(ietf_interface_filter)
             return response.xml
         except:
-            print("This is normal - continuing with changes...")
+            log_event('interface_config.fallback_failed', "This is normal - continuing with changes...",
+                      interface=INTERFACE_NAME, device=host)
             return None
 
 
@@ -316,9 +819,12 @@ def change_interface_description(connection, description):
     - Verified YANG model compatibility with IOS XR
     - Used as baseline for troubleshooting other changes
     """
-    print(f"\n[{datetime.now().strftime('%H:%M:%S')}] Changing interface description...")
-    print(f"  Target: {INTERFACE_NAME}")
-    print(f"  New Description: '{description}'")
+    host = _device_host(connection)
+    log_event('change.description.start',
+              f"\n[{_clock()}] Changing interface description...\n"
+              f"  Target: {INTERFACE_NAME}\n"
+              f"  New Description: '{description}'",
+              interface=INTERFACE_NAME, description=description, device=host)
     
     config = f"""
     <config>
@@ -334,16 +840,21 @@ def change_interface_description(connection, description):
     
     try:
         response = connection.edit_config(target='candidate', config=config)
-        print(f"  [OK] Configuration sent to candidate datastore")
+        log_event('change.description.edit', f"  [OK] Configuration sent to candidate datastore",
+                  interface=INTERFACE_NAME, device=host)
         connection.commit()
-        print(f"  [OK] Changes committed to running configuration")
-        print(f"[SUCCESS] Description successfully changed to: '{description}'")
+        log_event('change.description.ok',
+                  f"  [OK] Changes committed to running configuration\n"
+                  f"[SUCCESS] Description successfully changed to: '{description}'",
+                  interface=INTERFACE_NAME, description=description, device=host)
         return True
     except Exception as e:
-        print(f"[ERROR] Description change error: {e}")
-        print(f"  Error type: {type(e).__name__}")
         # Continue execution - partial failures shouldn't stop the script
-        print("[CONTINUE] Continuing with remaining changes...")
+        log_event('change.description.failed',
+                  f"[ERROR] Description change error: {e}\n"
+                  f"  Error type: {type(e).__name__}\n"
+                  "[CONTINUE] Continuing with remaining changes...",
+                  logging.ERROR, interface=INTERFACE_NAME, error=str(e), error_type=type(e).__name__, device=host)
         return False
 
 
@@ -363,10 +874,13 @@ def shutdown_interface(connection, shutdown=False):
     - Confirmed candidate datastore operations
     - Verified commit behavior
     """
+    host = _device_host(connection)
     action = "Enabling (no shutdown)" if not shutdown else "Disabling (shutdown)"
-    print(f"\n[{datetime.now().strftime('%H:%M:%S')}] {action} interface...")
-    print(f"  Target: {INTERFACE_NAME}")
-    print(f"  Operation: {'Remove shutdown' if not shutdown else 'Add shutdown'}")
+    log_event('change.state.start',
+              f"\n[{_clock()}] {action} interface...\n"
+              f"  Target: {INTERFACE_NAME}\n"
+              f"  Operation: {'Remove shutdown' if not shutdown else 'Add shutdown'}",
+              interface=INTERFACE_NAME, shutdown=shutdown, device=host)
     
     config = f"""
     <config>
@@ -382,20 +896,26 @@ def shutdown_interface(connection, shutdown=False):
     
     try:
         response = connection.edit_config(target='candidate', config=config)
-        print(f"  [OK] Configuration sent to candidate datastore")
+        log_event('change.state.edit', f"  [OK] Configuration sent to candidate datastore",
+                  interface=INTERFACE_NAME, device=host)
         connection.commit()
-        print(f"  [OK] Changes committed to running configuration")
-        print(f"[SUCCESS] Interface {INTERFACE_NAME} {'disabled' if shutdown else 'enabled'}")
+        log_event('change.state.ok',
+                  f"  [OK] Changes committed to running configuration\n"
+                  f"[SUCCESS] Interface {INTERFACE_NAME} {'disabled' if shutdown else 'enabled'}",
+                  interface=INTERFACE_NAME, shutdown=shutdown, device=host)
         return True
     except Exception as e:
-        print(f"[ERROR] Interface state change error: {e}")
-        print(f"  Error type: {type(e).__name__}")
+        message = (f"[ERROR] Interface state change error: {e}\n"
+                   f"  Error type: {type(e).__name__}\n")
         # Platform-specific YANG models may cause issues
-        if 'bad-element' in str(e) or 'unknown-element' in str(e):
-            print("  Note: YANG model compatibility issue detected")
-            print("  This is a known issue between IOS XE and IOS XR platforms")
+        yang_issue = 'bad-element' in str(e) or 'unknown-element' in str(e)
+        if yang_issue:
+            message += ("  Note: YANG model compatibility issue detected\n"
+                        "  This is a known issue between IOS XE and IOS XR platforms\n")
         # Continue execution - partial failures shouldn't stop the script
-        print("[CONTINUE] Continuing with remaining changes...")
+        message += "[CONTINUE] Continuing with remaining changes..."
+        log_event('change.state.failed', message, logging.ERROR, interface=INTERFACE_NAME,
+                  error=str(e), error_type=type(e).__name__, yang_issue=yang_issue, device=host)
         return False
 
 
@@ -415,13 +935,17 @@ def change_interface_mtu(connection, mtu=1500):
     - Verified no fragmentation issues
     - Confirmed standard Ethernet MTU (1500) works reliably
     """
-    print(f"\n[{datetime.now().strftime('%H:%M:%S')}] Changing interface MTU...")
-    print(f"  Target: {INTERFACE_NAME}")
-    print(f"  New MTU: {mtu} bytes")
+    host = _device_host(connection)
+    log_event('change.mtu.start',
+              f"\n[{_clock()}] Changing interface MTU...\n"
+              f"  Target: {INTERFACE_NAME}\n"
+              f"  New MTU: {mtu} bytes",
+              interface=INTERFACE_NAME, mtu=mtu, device=host)
     
     # Validate MTU range
     if mtu < 64 or mtu > 9216:
-        print(f"⚠ Warning: MTU {mtu} may be outside valid range (64-9216)")
+        log_event('change.mtu.range', f"⚠ Warning: MTU {mtu} may be outside valid range (64-9216)",
+                  logging.WARNING, interface=INTERFACE_NAME, mtu=mtu, device=host)
     
     config = f"""
     <config>
@@ -437,23 +961,29 @@ def change_interface_mtu(connection, mtu=1500):
     
     try:
         response = connection.edit_config(target='candidate', config=config)
-        print(f"  ✓ Configuration sent to candidate datastore")
+        log_event('change.mtu.edit', f"  ✓ Configuration sent to candidate datastore",
+                  interface=INTERFACE_NAME, device=host)
         connection.commit()
-        print(f"  ✓ Changes committed to running configuration")
-        print(f"✓ MTU successfully changed to: {mtu} bytes")
+        log_event('change.mtu.ok',
+                  f"  ✓ Changes committed to running configuration\n"
+                  f"✓ MTU successfully changed to: {mtu} bytes",
+                  interface=INTERFACE_NAME, mtu=mtu, device=host)
         return True
     except Exception as e:
         # Platform-specific YANG models may cause issues
-        if 'bad-element' in str(e) or 'unknown-element' in str(e):
-            print(f"⚠ MTU configuration not supported on this platform/sandbox")
-            print(f"  Reason: The YANG model path for MTU is not available")
-            print(f"  Note: This is common in DevNet sandboxes with restricted configurations")
-            print(f"  Impact: MTU remains at default value (typically 1514 bytes for IOS XR)")
+        yang_issue = 'bad-element' in str(e) or 'unknown-element' in str(e)
+        if yang_issue:
+            message = (f"⚠ MTU configuration not supported on this platform/sandbox\n"
+                       f"  Reason: The YANG model path for MTU is not available\n"
+                       f"  Note: This is common in DevNet sandboxes with restricted configurations\n"
+                       f"  Impact: MTU remains at default value (typically 1514 bytes for IOS XR)\n")
         else:
-            print(f"⚠ MTU change error: {e}")
-            print(f"  Error type: {type(e).__name__}")
+            message = (f"⚠ MTU change error: {e}\n"
+                       f"  Error type: {type(e).__name__}\n")
         # Continue execution - partial failures shouldn't stop the script
-        print("✓ Continuing with remaining changes...")
+        message += "✓ Continuing with remaining changes..."
+        log_event('change.mtu.failed', message, logging.ERROR, interface=INTERFACE_NAME,
+                  error=str(e), error_type=type(e).__name__, yang_issue=yang_issue, device=host)
         return False
 
 
@@ -463,15 +993,17 @@ def send_webex_notification(message):
     Note: WebEx API returns 204 (No Content) on success, which is a valid success response.
     Bug fix in v2.1 by Via Mae - Previously treated 204 as failure.
     """
-    print(f"\n[{datetime.now().strftime('%H:%M:%S')}] Sending WebEx notification...")
+    log_event('webex.start', f"\n[{_clock()}] Sending WebEx notification...")
     
     if WEBEX_WEBHOOK == "YOUR_WEBHOOK_URL_HERE":
-        print("⚠ WebEx webhook not configured.")
-        print("\n" + "="*70)
-        print("WEBEX TEAMS NOTIFICATION (Simulated)")
-        print("="*70)
-        print(message)
-        print("="*70 + "\n")
+        log_event('webex.simulated',
+                  "⚠ WebEx webhook not configured.\n"
+                  "\n" + "="*70 + "\n"
+                  "WEBEX TEAMS NOTIFICATION (Simulated)\n" +
+                  "="*70 + "\n" +
+                  message + "\n" +
+                  "="*70 + "\n",
+                  logging.WARNING)
         return True
     
     try:
@@ -482,19 +1014,779 @@ def send_webex_notification(message):
         # 204 No Content is the standard success response from WebEx API
         # 200 OK is also acceptable
         if response.status_code in [200, 204]:
-            print(f"✓ Notification sent successfully! (HTTP {response.status_code})")
-            print("✓ Message delivered to WebEx Teams channel")
+            log_event('webex.ok',
+                      f"✓ Notification sent successfully! (HTTP {response.status_code})\n"
+                      "✓ Message delivered to WebEx Teams channel",
+                      status=response.status_code)
             return True
         else:
-            print(f"⚠ Unexpected response code: {response.status_code}")
-            print(f"Response: {response.text}")
+            log_event('webex.unexpected_status',
+                      f"⚠ Unexpected response code: {response.status_code}\n"
+                      f"Response: {response.text}",
+                      logging.WARNING, status=response.status_code, response=response.text)
             return False
     except Exception as e:
-        print(f"✗ Error sending notification: {e}")
-        print("⚠ Network notification failed, but device changes were successful")
+        log_event('webex.failed',
+                  f"✗ Error sending notification: {e}\n"
+                  "⚠ Network notification failed, but device changes were successful",
+                  logging.ERROR, error=str(e))
         return False
 
 
+# ============ INTERFACE TELEMETRY ============
+
+# Operational fields read from ietf-interfaces interfaces-state
+STATUS_FIELDS = ('admin-status', 'oper-status', 'mtu')
+COUNTER_FIELDS = ('in-octets', 'out-octets', 'in-unicast-pkts', 'out-unicast-pkts',
+                  'in-errors', 'out-errors', 'in-discards', 'out-discards')
+TELEMETRY_COLUMNS = ('t', 'if', 'key') + STATUS_FIELDS + COUNTER_FIELDS
+
+
+def build_interfaces_state_filter(interface_names=None):
+    """IETF interfaces-state filter for the given interfaces (all interfaces if None)"""
+    if interface_names:
+        entries = "".join(f"<interface><name>{name}</name></interface>" for name in interface_names)
+    else:
+        entries = "<interface/>"
+    return f"""
+<filter>
+  <interfaces-state xmlns="urn:ietf:params:xml:ns:yang:ietf-interfaces">
+    {entries}
+  </interfaces-state>
+</filter>
+"""
+
+
+def parse_interfaces_state(state_xml):
+    """
+    Extract oper-status, MTU and counters per interface from an
+    interfaces-state reply. Returns {interface_name: sample}.
+    """
+    samples = {}
+    if not state_xml:
+        return samples
+
+    for block in re.findall(r'<interface>(.*?)</interface>', state_xml, re.DOTALL):
+        name_match = re.search(r'<name>(.*?)</name>', block)
+        if not name_match:
+            continue
+        sample = {}
+        for field in ('admin-status', 'oper-status'):
+            match = re.search(rf'<{field}>(.*?)</{field}>', block)
+            if match:
+                sample[field] = match.group(1).strip()
+        # MTU is only present when ietf-ip augments the interface (ipv4/mtu)
+        mtu_match = re.search(r'<mtu>(\d+)</mtu>', block)
+        if mtu_match:
+            sample['mtu'] = int(mtu_match.group(1))
+        for field in COUNTER_FIELDS:
+            match = re.search(rf'<{field}>(\d+)</{field}>', block)
+            if match:
+                sample[field] = int(match.group(1))
+        samples[name_match.group(1).strip()] = sample
+
+    return samples
+
+
+def poll_interface_state(connection, interface_names=None):
+    """Read operational state for the given interfaces in a single <get>"""
+    response = connection.get(build_interfaces_state_filter(interface_names))
+    return parse_interfaces_state(response.xml)
+
+
+class InterfaceTelemetry:
+    """
+    Delta-encoded interface telemetry for one device.
+    Only the last sample per interface is kept in full. Every poll appends
+    one compact record per interface that changed: status fields carry the
+    new value, counters carry the increase since the previous sample. The
+    first sample of an interface, one after a counter reset, and every
+    `keyframe_every`-th record are stored as keyframes with absolute values.
+    Records live in a fixed-size ring buffer, so memory stays bounded however
+    long the collector runs. Keyframes can be evicted from the ring, so
+    `last` is always saved with it as the absolute baseline (see
+    save_telemetry).
+    """
+
+    def __init__(self, host, history=TELEMETRY_HISTORY, keyframe_every=TELEMETRY_KEYFRAME_EVERY):
+        self.host = host
+        self.keyframe_every = keyframe_every
+        self.last = {}
+        self.records = deque(maxlen=history)
+        self._since_keyframe = {}
+
+    def record(self, samples, timestamp=None):
+        """Add one poll result and return the delta records it produced"""
+        timestamp = round(timestamp if timestamp is not None else time.time(), 3)
+        deltas = []
+        for name, sample in samples.items():
+            previous = self.last.get(name)
+            counter_reset = previous is not None and any(
+                sample.get(field, 0) < previous.get(field, 0)
+                for field in COUNTER_FIELDS if field in sample and field in previous)
+
+            keyframe_due = self._since_keyframe.get(name, 0) + 1 >= self.keyframe_every
+            if previous is None or counter_reset:
+                delta = {'t': timestamp, 'if': name, 'key': True}
+                delta.update(sample)
+            else:
+                delta = {'t': timestamp, 'if': name}
+                for field in STATUS_FIELDS:
+                    if field in sample and sample[field] != previous.get(field):
+                        delta[field] = sample[field]
+                for field in COUNTER_FIELDS:
+                    if field in sample and sample[field] != previous.get(field, 0):
+                        delta[field] = sample[field] - previous.get(field, 0)
+                if len(delta) == 2:
+                    # Nothing changed since the last poll - store nothing
+                    continue
+                if keyframe_due:
+                    delta = {'t': timestamp, 'if': name, 'key': True}
+                    delta.update(sample)
+
+            self._since_keyframe[name] = 0 if delta.get('key') else self._since_keyframe.get(name, 0) + 1
+            self.last[name] = sample
+            self.records.append(delta)
+            deltas.append(delta)
+
+            if previous is not None and sample.get('oper-status') != previous.get('oper-status'):
+                log_event('telemetry.oper_status',
+                          f"  {name}: oper-status {previous.get('oper-status')} -> {sample.get('oper-status')}",
+                          device=self.host, interface=name,
+                          previous=previous.get('oper-status'), current=sample.get('oper-status'))
+        return deltas
+
+    def to_columns(self):
+        """Ring buffer contents in columnar form: {column: [values...]}"""
+        return {column: [record.get(column) for record in self.records] for column in TELEMETRY_COLUMNS}
+
+
+def save_telemetry(telemetry, path):
+    """
+    Write the ring buffers of several devices to one columnar JSON file.
+    Each device also gets its `last` absolute sample per interface, so the
+    file can be decoded even after every keyframe has left the ring
+    (subtract the increments backwards from `last`).
+    """
+    data = {
+        'columns': list(TELEMETRY_COLUMNS),
+        'devices': {host: device.to_columns() for host, device in telemetry.items()},
+        'last': {host: device.last for host, device in telemetry.items()},
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, separators=(',', ':'))
+    log_event('telemetry.saved', f"Telemetry saved to: {path}", file=path,
+              records=sum(len(device.records) for device in telemetry.values()))
+
+
+def collect_interface_telemetry(devices=None, interface_names=None, interval=None, polls=None,
+                                stop_event=None, telemetry=None):
+    """
+    Poll interfaces-state on many devices and keep delta-encoded history.
+    Devices are polled in parallel every `interval` seconds, reusing one
+    ResilientConnection per device. Runs `polls` rounds or until
+    `stop_event` is set - at least one of them is required.
+    Pass your own `telemetry` dict to keep what was collected even if the
+    loop is interrupted (it is filled in place). Returns {host: InterfaceTelemetry}.
+    """
+    if polls is None and stop_event is None:
+        raise ValueError("collect_interface_telemetry needs polls or a stop_event to finish")
+    devices = devices or [DEVICE]
+    interval = interval if interval is not None else TELEMETRY_INTERVAL
+    stop_event = stop_event or threading.Event()
+    telemetry = telemetry if telemetry is not None else {}
+    for device in devices:
+        telemetry.setdefault(device['host'], InterfaceTelemetry(device['host']))
+    connections = {}
+
+    def poll_device(device):
+        host = device['host']
+        connection = connections.get(host)
+        if connection is None:
+            connection = connect_to_device(device)
+            if connection is None:
+                # Circuit breaker keeps retries cheap on the next rounds
+                return
+            connections[host] = connection
+        try:
+            samples = poll_interface_state(connection, interface_names)
+        except Exception as e:
+            log_event('telemetry.poll_failed', f"⚠ Telemetry poll failed on {host}: {e}",
+                      logging.WARNING, device=host, error=str(e))
+            return
+        deltas = telemetry[host].record(samples)
+        log_event('telemetry.poll', f"  {host}: {len(samples)} interfaces, {len(deltas)} changed",
+                  logging.DEBUG, device=host, interfaces=len(samples), changed=len(deltas))
+
+    rounds = 0
+    try:
+        with ThreadPoolExecutor(max_workers=min(TELEMETRY_WORKERS, len(devices))) as pool:
+            while not stop_event.is_set():
+                started = time.monotonic()
+                list(pool.map(poll_device, devices))
+                rounds += 1
+                if polls is not None and rounds >= polls:
+                    break
+                stop_event.wait(max(0, interval - (time.monotonic() - started)))
+    finally:
+        for connection in connections.values():
+            try:
+                connection.close_session()
+            except Exception:
+                pass
+    return telemetry
+
+
+def verify_interface_up(connection, interface_name=INTERFACE_NAME, timeout=60, interval=5):
+    """
+    Confirm after a change that an interface is oper-status 'up' and
+    passing traffic (octet counters increasing between two polls).
+    Returns True once both hold, False if `timeout` expires first.
+    """
+    host = _device_host(connection)
+    telemetry = InterfaceTelemetry(host)
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            samples = poll_interface_state(connection, [interface_name])
+        except Exception as e:
+            log_event('telemetry.poll_failed', f"⚠ Could not read operational state: {e}",
+                      logging.WARNING, device=host, interface=interface_name, error=str(e))
+            return False
+        if interface_name not in samples:
+            # Device does not expose interfaces-state for it - waiting won't help
+            log_event('telemetry.unavailable',
+                      f"⚠ No operational state reported for {interface_name} - skipping verification",
+                      logging.WARNING, device=host, interface=interface_name)
+            return False
+        deltas = telemetry.record(samples)
+
+        latest = telemetry.last.get(interface_name, {})
+        delta = next((d for d in deltas if d['if'] == interface_name and not d.get('key')), {})
+        passing_traffic = delta.get('in-octets', 0) > 0 or delta.get('out-octets', 0) > 0
+        if latest.get('oper-status') == 'up' and passing_traffic:
+            log_event('telemetry.verified', f"✓ {interface_name} is up and passing traffic",
+                      device=host, interface=interface_name)
+            return True
+        if time.monotonic() >= deadline:
+            log_event('telemetry.not_verified',
+                      f"⚠ {interface_name} not confirmed up with traffic "
+                      f"(oper-status: {latest.get('oper-status', 'unknown')})",
+                      logging.WARNING, device=host, interface=interface_name,
+                      oper_status=latest.get('oper-status'))
+            return False
+        time.sleep(interval)
+
+
+# ============ FLEET COMPLIANCE REPORT ============
+
+# Bump when _parse_interface_block() changes so cached indexes are rebuilt
+INDEX_VERSION = 1
+REPORT_FIELDS = ('device', 'interface', 'issue', 'value')
+
+
+def _index_snapshot(path):
+    """Process pool worker: read one snapshot and return its interface index"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return index_interfaces(f.read())
+
+
+def _snapshot_key(path):
+    """Cheap change detector for a snapshot file"""
+    stat = os.stat(path)
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def load_snapshot_indexes(snapshots, cache_path=None):
+    """
+    Return {device: interface index} for the given {device: snapshot path}.
+    Indexes are cached in `cache_path` keyed by file mtime/size; only new or
+    changed snapshots are parsed, in parallel over a process pool.
+    """
+    cache_path = cache_path or REPORT_CACHE
+    cache = {}
+    if os.path.exists(cache_path):
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+        except (OSError, ValueError) as e:
+            log_event('report.cache_unreadable', f"⚠ Ignoring unreadable report cache: {e}",
+                      logging.WARNING, file=cache_path, error=str(e))
+        if cache.get('version') != INDEX_VERSION:
+            cache = {}
+    entries = cache.get('snapshots', {})
+
+    paths = {device: os.path.abspath(path) for device, path in snapshots.items()}
+    keys = {path: _snapshot_key(path) for path in paths.values()}
+    stale = [path for path, key in keys.items()
+             if path not in entries or entries[path]['key'] != key]
+
+    if stale:
+        with ProcessPoolExecutor(max_workers=REPORT_WORKERS) as pool:
+            for path, index in zip(stale, pool.map(_index_snapshot, stale, chunksize=16)):
+                entries[path] = {'key': keys[path], 'index': index}
+
+    # Keep other devices' entries (a report on a subset must not evict them),
+    # but drop snapshots whose files are gone so the cache does not grow forever
+    entries = {path: entry for path, entry in entries.items() if path in keys or os.path.exists(path)}
+    # Write to a temporary file first so an interrupted run never leaves a truncated cache
+    temp_path = f"{cache_path}.{os.getpid()}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump({'version': INDEX_VERSION, 'snapshots': entries}, f, separators=(',', ':'))
+    os.replace(temp_path, cache_path)
+
+    log_event('report.indexed',
+              f"Snapshots: {len(keys)} total, {len(stale)} parsed, {len(keys) - len(stale)} from cache",
+              snapshots=len(keys), parsed=len(stale), cached=len(keys) - len(stale))
+    return {device: entries[path]['index'] for device, path in paths.items()}
+
+
+def check_interface_compliance(device, name, values):
+    """Return the compliance findings for one interface"""
+    findings = []
+    if values['mtu'] is not None and values['mtu'] not in COMPLIANCE_MTUS:
+        findings.append({'device': device, 'interface': name,
+                         'issue': 'non-standard MTU', 'value': values['mtu']})
+    if not values['description']:
+        findings.append({'device': device, 'interface': name,
+                         'issue': 'missing description', 'value': ''})
+    if values['shutdown'] and not re.search(COMPLIANCE_SHUTDOWN_OK, values['description'] or ''):
+        findings.append({'device': device, 'interface': name,
+                         'issue': 'unexpected shutdown', 'value': values['description'] or ''})
+    return findings
+
+
+def write_compliance_report(findings, path):
+    """Write findings as CSV, HTML or JSON depending on the file extension"""
+    extension = os.path.splitext(path)[1].lower()
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        if extension == '.csv':
+            writer = csv.DictWriter(f, fieldnames=REPORT_FIELDS)
+            writer.writeheader()
+            writer.writerows(findings)
+        elif extension in ('.html', '.htm'):
+            f.write("<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\">"
+                    "<title>Interface Compliance Report</title></head><body>\n"
+                    f"<h1>Interface Compliance Report</h1>\n"
+                    f"<p>Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - "
+                    f"{len(findings)} findings</p>\n<table border=\"1\">\n<tr>")
+            f.write("".join(f"<th>{field}</th>" for field in REPORT_FIELDS) + "</tr>\n")
+            for finding in findings:
+                f.write("<tr>" + "".join(f"<td>{html.escape(str(finding[field]))}</td>"
+                                         for field in REPORT_FIELDS) + "</tr>\n")
+            f.write("</table>\n</body></html>\n")
+        elif extension == '.json':
+            json.dump(findings, f, indent=2)
+        else:
+            raise ValueError(f"Unsupported report format: {path} (use .csv, .html or .json)")
+    log_event('report.saved', f"Compliance report saved to: {path}", file=path, findings=len(findings))
+
+
+def generate_compliance_report(snapshots=None, outputs=('compliance_report.csv',), cache_path=None):
+    """
+    Fleet compliance report: non-standard MTU, missing descriptions and
+    unexpected shutdown for every interface on every device.
+    `snapshots` maps device -> running config file; by default every
+    SNAPSHOT_DIR/<device>.xml is used. Returns the list of findings.
+    """
+    if snapshots is None:
+        snapshots = {os.path.splitext(os.path.basename(path))[0]: path
+                     for path in sorted(glob.glob(os.path.join(SNAPSHOT_DIR, '*.xml')))}
+
+    indexes = load_snapshot_indexes(snapshots, cache_path)
+
+    findings = []
+    for device in sorted(indexes):
+        for name in sorted(indexes[device]):
+            findings.extend(check_interface_compliance(device, name, indexes[device][name]))
+
+    for path in outputs:
+        write_compliance_report(findings, path)
+
+    log_event('report.complete',
+              f"✓ Compliance report: {len(findings)} findings across {len(indexes)} devices",
+              devices=len(indexes), findings=len(findings))
+    return findings
+
+
+# ============ CHANGE QUEUE ============
+
+# Leaves a change request may set on an interface
+CHANGE_LEAVES = ('description', 'shutdown', 'mtu')
+# IOS XR interface names: GigabitEthernet0/0/0/0, Bundle-Ether1.100, MgmtEth0/RP0/CPU0/0
+INTERFACE_NAME_PATTERN = re.compile(r'[A-Za-z][A-Za-z-]*\d[A-Za-z0-9/.:-]*')
+
+
+def validate_change_request(request, devices):
+    """Raise ValueError if a change request is malformed; returns the request"""
+    if not isinstance(request, dict):
+        raise ValueError("change request must be a JSON object")
+    if not isinstance(request.get('device'), str) or request['device'] not in devices:
+        raise ValueError(f"unknown device: {request.get('device')!r}")
+    interface = request.get('interface')
+    if not isinstance(interface, str) or not INTERFACE_NAME_PATTERN.fullmatch(interface):
+        raise ValueError(f"'interface' must be an interface name like {INTERFACE_NAME}")
+    if 'client' in request and not isinstance(request['client'], str):
+        raise ValueError("'client' must be a string")
+    leaves = [leaf for leaf in CHANGE_LEAVES if leaf in request]
+    if not leaves:
+        raise ValueError(f"change request must set at least one of: {', '.join(CHANGE_LEAVES)}")
+    if 'description' in request and (not isinstance(request['description'], str) or
+                                     len(request['description']) > 1024 or
+                                     not request['description'].isprintable()):
+        raise ValueError("'description' must be a printable string of at most 1024 characters")
+    if 'shutdown' in request and not isinstance(request['shutdown'], bool):
+        raise ValueError("'shutdown' must be true or false")
+    if 'mtu' in request and (not isinstance(request['mtu'], int) or isinstance(request['mtu'], bool) or
+                             not 64 <= request['mtu'] <= 9216):
+        raise ValueError("'mtu' must be an integer between 64 and 9216")
+    return request
+
+
+def merge_change_requests(requests_batch):
+    """
+    Merge change requests for one device, last writer wins per leaf.
+    Returns (merged, overridden): `merged` maps interface -> {leaf: value}
+    using the latest request for each leaf; `overridden[i]` lists the leaves
+    of request i that a later request replaced with a different value.
+    """
+    winners = {}
+    for position, request in enumerate(requests_batch):
+        for leaf in CHANGE_LEAVES:
+            if leaf in request:
+                winners[(request['interface'], leaf)] = position
+
+    merged = {}
+    overridden = [[] for _ in requests_batch]
+    for position, request in enumerate(requests_batch):
+        for leaf in CHANGE_LEAVES:
+            if leaf not in request:
+                continue
+            key = (request['interface'], leaf)
+            winner = requests_batch[winners[key]]
+            if winners[key] == position:
+                merged.setdefault(request['interface'], {})[leaf] = request[leaf]
+            elif winner[leaf] != request[leaf]:
+                overridden[position].append({
+                    'interface': request['interface'], 'leaf': leaf,
+                    'requested': request[leaf], 'applied': winner[leaf],
+                    'winner': winner.get('client', 'unknown'),
+                })
+    return merged, overridden
+
+
+def build_interface_config(changes):
+    """Build one edit-config payload for {interface: {leaf: value}}"""
+    blocks = []
+    for interface_name, leaves in changes.items():
+        lines = ["        <interface-configuration>",
+                 "          <active>act</active>",
+                 f"          <interface-name>{html.escape(interface_name, quote=False)}</interface-name>"]
+        if 'description' in leaves:
+            lines.append(f"          <description>{html.escape(leaves['description'], quote=False)}</description>")
+        if 'shutdown' in leaves:
+            # Same encoding as shutdown_interface()
+            shutdown = "" if leaves['shutdown'] else "nc:operation='delete'"
+            lines.append(f"          <shutdown>{shutdown}</shutdown>")
+        if 'mtu' in leaves:
+            lines.append(f"          <mtu>{leaves['mtu']}</mtu>")
+        lines.append("        </interface-configuration>")
+        blocks.append("\n".join(lines))
+    return ("""
+    <config>
+      <interface-configurations xmlns="http://cisco.com/ns/yang/Cisco-IOS-XR-ifmgr-cfg">
+""" + "\n".join(blocks) + """
+      </interface-configurations>
+    </config>
+    """)
+
+
+class ChangeQueue:
+    """
+    Per-device work queue that merges change requests into one commit.
+    The first request for a device opens a CHANGE_MERGE_WINDOW; everything
+    that arrives for that device inside the window is merged (last writer
+    wins per leaf) and applied with a single edit-config/commit. Batches for
+    the same device never run concurrently, so operators no longer collide
+    on the candidate datastore. submit() returns a Future with the caller's
+    own result.
+    """
+
+    def __init__(self, devices=None, window=None):
+        self.devices = {device['host']: device for device in devices or [DEVICE]}
+        self.window = window if window is not None else CHANGE_MERGE_WINDOW
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._device_locks = {host: threading.Lock() for host in self.devices}
+
+    def submit(self, request):
+        validate_change_request(request, self.devices)
+        future = Future()
+        host = request['device']
+        with self._lock:
+            batch = self._pending.setdefault(host, [])
+            batch.append((request, future))
+            first = len(batch) == 1
+        if first:
+            timer = threading.Timer(self.window, self._flush, args=(host,))
+            timer.daemon = True
+            timer.start()
+        log_event('queue.submitted',
+                  f"  Queued change from {request.get('client', 'unknown')} for {host} {request['interface']}",
+                  device=host, client=request.get('client'), interface=request['interface'])
+        return future
+
+    def _flush(self, host):
+        # Requests arriving while this batch is applied start the next window
+        with self._device_locks[host]:
+            with self._lock:
+                batch = self._pending.pop(host, [])
+            if batch:
+                self._apply(host, batch)
+
+    def _apply(self, host, batch):
+        requests_batch = [request for request, _ in batch]
+        results = [{'success': False, 'device': host, 'merged_requests': len(batch),
+                    'applied': {}, 'overridden': [], 'error': None}
+                   for _ in batch]
+
+        # Every future is resolved in the finally block - an unexpected error
+        # here must not leave callers waiting for CHANGE_RESULT_TIMEOUT
+        try:
+            merged, overridden = merge_change_requests(requests_batch)
+            for result, conflicts in zip(results, overridden):
+                result['overridden'] = conflicts
+            log_event('queue.apply',
+                      f"\n[{_clock()}] Applying {len(batch)} queued change request(s) to {host} in one commit...",
+                      device=host, requests=len(batch), interfaces=len(merged))
+
+            connection = connect_to_device(self.devices[host])
+            if connection is None:
+                for result in results:
+                    result['error'] = f"could not connect to {host}"
+            else:
+                try:
+                    self._commit(connection, host, merged, requests_batch, overridden, results)
+                finally:
+                    try:
+                        connection.close_session()
+                    except Exception:
+                        pass
+        except Exception as e:
+            log_event('queue.apply_failed', f"✗ Applying queued changes on {host} failed: {e}",
+                      logging.ERROR, device=host, error=str(e), error_type=type(e).__name__)
+            for result in results:
+                if not result['success']:
+                    result['error'] = result['error'] or f"{type(e).__name__}: {e}"
+        finally:
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+    def _commit(self, connection, host, merged, requests_batch, overridden, results):
+        try:
+            connection.edit_config(target='candidate', config=build_interface_config(merged))
+            connection.commit()
+        except Exception as e:
+            log_event('queue.batch_failed',
+                      f"⚠ Merged commit on {host} failed: {e}\n"
+                      "  Retrying each request on its own so one bad change does not block the rest...",
+                      logging.WARNING, device=host, error=str(e))
+            try:
+                connection.discard_changes()
+            except Exception:
+                pass
+        else:
+            for request, result in zip(requests_batch, results):
+                result['success'] = True
+                result['applied'] = self._winning_leaves(request, merged)
+                for conflict in result['overridden']:
+                    conflict['committed'] = True
+            log_event('queue.committed', f"✓ {len(requests_batch)} change request(s) committed on {host}",
+                      device=host, requests=len(requests_batch))
+            return
+
+        # Fallback: apply each request's winning leaves separately. An
+        # (interface, leaf) is committed at most once; requests that asked for
+        # the same value share its outcome. A leaf that failed alongside others
+        # is retried only when a later request pairs it with a different set.
+        committed = set()
+        failures = {}  # (interface, leaf) -> (leaves it failed with, error)
+        for request in requests_batch:
+            pending = {leaf: value for leaf, value in self._winning_leaves(request, merged).items()
+                       if (request['interface'], leaf) not in committed}
+            keys = frozenset((request['interface'], leaf) for leaf in pending)
+            if not keys or all(failures.get(key, (None,))[0] == keys for key in keys):
+                continue
+            try:
+                connection.edit_config(target='candidate',
+                                       config=build_interface_config({request['interface']: pending}))
+                connection.commit()
+                committed.update(keys)
+            except Exception as e:
+                failures.update((key, (keys, str(e))) for key in keys)
+                try:
+                    connection.discard_changes()
+                except Exception:
+                    pass
+
+        for request, result in zip(requests_batch, results):
+            leaves = self._winning_leaves(request, merged)
+            errors = [failures[(request['interface'], leaf)][1] for leaf in leaves
+                      if (request['interface'], leaf) not in committed]
+            result['applied'] = {leaf: value for leaf, value in leaves.items()
+                                 if (request['interface'], leaf) in committed}
+            result['success'] = not errors
+            result['error'] = errors[0] if errors else None
+
+            # Overridden requests only succeed if the value that replaced theirs reached the device
+            for conflict in result['overridden']:
+                conflict['committed'] = (conflict['interface'], conflict['leaf']) in committed
+            lost = [f"{conflict['interface']} {conflict['leaf']}"
+                    for conflict in result['overridden'] if not conflict['committed']]
+            if lost:
+                result['success'] = False
+                result['error'] = result['error'] or (
+                    f"the value that replaced yours was not applied: {', '.join(lost)}")
+
+    @staticmethod
+    def _winning_leaves(request, merged):
+        """The leaves of `request` that survived the merge with their applied value"""
+        applied = merged.get(request['interface'], {})
+        return {leaf: applied[leaf] for leaf in CHANGE_LEAVES
+                if leaf in request and applied.get(leaf) == request[leaf]}
+
+
+class _ChangeQueueHandler(BaseHTTPRequestHandler):
+    """POST /changes with a JSON change request; replies with that caller's result"""
+
+    change_queue = None
+    token = None
+
+    def do_POST(self):
+        if self.path != '/changes':
+            self._reply(404, {'success': False, 'error': 'not found'})
+            return
+        if self.token and not hmac.compare_digest(
+                self.headers.get('Authorization', '').encode('utf-8'),
+                f"Bearer {self.token}".encode('utf-8')):
+            log_event('queue.unauthorized', f"⚠ Rejected change request from {self.address_string()}",
+                      logging.WARNING, client=self.address_string())
+            self._reply(401, {'success': False, 'error': 'missing or invalid token'})
+            return
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            future = self.change_queue.submit(json.loads(self.rfile.read(length)))
+        except (ValueError, TypeError) as e:
+            # Malformed JSON or a request that failed validation
+            self._reply(400, {'success': False, 'error': str(e)})
+            return
+        try:
+            self._reply(200, future.result(timeout=CHANGE_RESULT_TIMEOUT))
+        except FutureTimeoutError:
+            self._reply(504, {'success': False, 'error': 'timed out waiting for the device commit'})
+
+    def _reply(self, status, body):
+        payload = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        log_event('queue.http', format % args, logging.DEBUG, client=self.address_string())
+
+
+def _is_loopback(host):
+    """True if `host` only accepts local connections"""
+    if host == 'localhost':
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def serve_change_queue(devices=None, host=None, port=None, token=None):
+    """
+    Run the change queue service until interrupted.
+    Every request must carry the shared token when one is set. Listening
+    on anything other than loopback without a token is refused, since the
+    endpoint commits router configuration.
+    """
+    host = host or CHANGE_QUEUE_HOST
+    port = port or CHANGE_QUEUE_PORT
+    token = token or CHANGE_QUEUE_TOKEN
+    if not token and not _is_loopback(host):
+        raise ValueError(f"refusing to listen on {host} without CHANGE_QUEUE_TOKEN set")
+    handler = type('ChangeQueueHandler', (_ChangeQueueHandler,),
+                   {'change_queue': ChangeQueue(devices), 'token': token})
+    server = ThreadingHTTPServer((host, port), handler)
+    log_event('queue.listening',
+              f"Change queue listening on http://{host}:{port}/changes"
+              f" ({'token required' if token else 'local only, no token'})",
+              host=host, port=port, token_required=bool(token))
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+
+
+def submit_change_request(request, url=None, token=None):
+    """Send one change request to the queue service and wait for its result"""
+    url = (url or CHANGE_QUEUE_URL).rstrip('/') + '/changes'
+    token = token or CHANGE_QUEUE_TOKEN
+    request = dict(request)
+    request.setdefault('device', DEVICE['host'])
+    request.setdefault('client', f"{getpass.getuser()}@{socket.gethostname()}")
+    headers = {'Content-Type': 'application/json'}
+    if token:
+        headers['Authorization'] = f"Bearer {token}"
+    try:
+        response = requests.post(url, json=request, headers=headers,
+                                 timeout=CHANGE_RESULT_TIMEOUT + CHANGE_MERGE_WINDOW)
+        result = response.json()
+    except Exception as e:
+        log_event('queue.submit_failed', f"✗ Could not reach change queue: {e}", logging.ERROR,
+                  url=url, error=str(e))
+        return {'success': False, 'error': str(e), 'applied': {}, 'overridden': []}
+
+    for conflict in result.get('overridden', []):
+        log_event('queue.conflict',
+                  f"  ⚠ {conflict['interface']} {conflict['leaf']}: your value {conflict['requested']!r} "
+                  f"was replaced by {conflict['applied']!r} from {conflict['winner']}",
+                  logging.WARNING, **conflict)
+    return result
+
+
+def submit_interface_changes(description, shutdown, mtu):
+    """
+    Send the three interface changes through the change queue.
+    They are submitted as separate requests (merged into one commit by the
+    service) so an unsupported leaf only fails its own change.
+    Returns {'description': bool, 'shutdown': bool, 'mtu': bool}.
+    """
+    log_event('queue.submit', f"\n[{_clock()}] Sending changes to change queue at {CHANGE_QUEUE_URL}...",
+              url=CHANGE_QUEUE_URL)
+    changes = {
+        'description': {'interface': INTERFACE_NAME, 'description': description},
+        'shutdown': {'interface': INTERFACE_NAME, 'shutdown': shutdown},
+        'mtu': {'interface': INTERFACE_NAME, 'mtu': mtu},
+    }
+    with ThreadPoolExecutor(max_workers=len(changes)) as pool:
+        futures = {leaf: pool.submit(submit_change_request, change) for leaf, change in changes.items()}
+    results = {leaf: future.result() for leaf, future in futures.items()}
+    for leaf, result in results.items():
+        if result['success']:
+            log_event('queue.result', f"  [OK] {leaf} committed ({result.get('merged_requests', 1)} request(s) in batch)",
+                      leaf=leaf, merged_requests=result.get('merged_requests'))
+        else:
+            log_event('queue.result', f"  [ERROR] {leaf} not applied: {result.get('error')}",
+                      logging.ERROR, leaf=leaf, error=result.get('error'))
+    return {leaf: result['success'] for leaf, result in results.items()}
+
+
 # ============ MAIN AUTOMATION WORKFLOW ============
 
 def main():
@@ -507,11 +1799,14 @@ def main():
     5. Send notification
     """
     
-    print("\n" + "="*70)
-    print("     NETWORK AUTOMATION TOOL - L1 Support Engineers")
-    print("     Project Activity 5: NETCONF/YANG/Python Automation")
-    print("     Device: IOS XR Platform")
-    print("="*70)
+    setup_logging()
+
+    log_event('run.start',
+              "\n" + "="*70 + "\n"
+              "     NETWORK AUTOMATION TOOL - L1 Support Engineers\n"
+              "     Project Activity 5: NETCONF/YANG/Python Automation\n"
+              "     Device: IOS XR Platform\n" +
+              "="*70)
 
     # IMPORTANT: Read last run's data BEFORE we overwrite the files
     # We need to do this before get_running_config() overwrites config_before.xml
@@ -520,17 +1815,21 @@ def main():
     # Step 1: Connect to device
     connection = connect_to_device()
     if not connection:
-        print("\n✗ FAILED: Could not connect to device")
-        print("\nTroubleshooting steps:")
-        print("1. Check your internet connection")
-        print("2. Verify DevNet Sandbox is active")
-        print("3. Confirm credentials are correct")
+        log_event('run.aborted',
+                  "\n✗ FAILED: Could not connect to device\n"
+                  "\nTroubleshooting steps:\n"
+                  "1. Check your internet connection\n"
+                  "2. Verify DevNet Sandbox is active\n"
+                  "3. Confirm credentials are correct",
+                  logging.ERROR)
         return
 
     # Step 2: Get BEFORE configuration (this will overwrite config_before.xml)
-    print("\n" + "─"*70)
-    print("STEP 1: Verify Current Running Configuration (BEFORE)")
-    print("─"*70)
+    log_event('run.step',
+              "\n" + "─"*70 + "\n"
+              "STEP 1: Verify Current Running Configuration (BEFORE)\n" +
+              "─"*70,
+              step=1)
     config_before = get_running_config(connection, save_as='config_before.xml', create_backup=True)
     interface_config_before = get_interface_config(connection)
     
@@ -538,38 +1837,49 @@ def main():
     before_values = extract_interface_values(config_before if config_before else interface_config_before)
     
     # Debug: Show what we extracted
-    print("\nCurrent Configuration Detected:")
-    print(f"   Description: {before_values['description']}")
-    print(f"   State: {before_values['state']}")
-    print(f"   MTU: {before_values['mtu']}")
+    log_event('interface.before',
+              "\nCurrent Configuration Detected:\n"
+              f"   Description: {before_values['description']}\n"
+              f"   State: {before_values['state']}\n"
+              f"   MTU: {before_values['mtu']}",
+              interface=INTERFACE_NAME, **before_values)
     
     if not config_before:
-        print("\n⚠ WARNING: Could not retrieve full configuration")
-        print("Continuing with changes...")
+        log_event('run.warning',
+                  "\n⚠ WARNING: Could not retrieve full configuration\n"
+                  "Continuing with changes...",
+                  logging.WARNING)
     
     # Step 3: Make THREE changes
-    print("\n" + "─"*70)
-    print("STEP 2: Making Configuration Changes")
-    print("─"*70)
+    log_event('run.step',
+              "\n" + "─"*70 + "\n"
+              "STEP 2: Making Configuration Changes\n" +
+              "─"*70,
+              step=2)
     
     # Get user input for configuration changes
-    print("\n" + "="*70)
-    print("Configuration Change Inputs")
-    print("="*70)
+    log_event('input.start',
+              "\n" + "="*70 + "\n"
+              "Configuration Change Inputs\n" +
+              "="*70)
     
     # Input 1: Interface Description
-    print("\n[1] Interface Description")
-    print("    Purpose: Identify the interface and its management method")
-    print("    Example: L1-SE-Managed-Automated-Tool, Link-to-CoreRouter, etc.")
+    log_event('input.prompt',
+              "\n[1] Interface Description\n"
+              "    Purpose: Identify the interface and its management method\n"
+              "    Example: L1-SE-Managed-Automated-Tool, Link-to-CoreRouter, etc.")
+    flush_logging()
     description_input = input("    Enter description [default: L1-SE-Managed-Automated-Tool]: ").strip()
     if not description_input:
         description_input = "L1-SE-Managed-Automated-Tool"
     
     # Input 2: Interface State (Shutdown or No Shutdown)
-    print("\n[2] Interface Administrative State")
-    print("    Purpose: Enable or disable the interface")
-    print("    Options: 'enable' (no shutdown) or 'disable' (shutdown)")
+    log_event('input.prompt',
+              "\n[2] Interface Administrative State\n"
+              "    Purpose: Enable or disable the interface\n"
+              "    Options: 'enable' (no shutdown) or 'disable' (shutdown)")
     while True:
+        flush_logging()
         state_input = input("    Enter state [default: enable]: ").strip()
         state_input_lower = state_input.lower()
         if not state_input:
@@ -579,13 +1889,15 @@ def main():
             # Normalize input
             shutdown_value = state_input_lower in ['disable', 'disabled', 'shutdown']
             break
-        print("    ⚠ Invalid input. Please enter 'enable' or 'disable'")
+        log_event('input.invalid', "    ⚠ Invalid input. Please enter 'enable' or 'disable'", logging.WARNING)
     
     # Input 3: MTU Value
-    print("\n[3] Maximum Transmission Unit (MTU)")
-    print("    Purpose: Set maximum frame size for the interface")
-    print("    Valid range: 64-9216 bytes (Standard Ethernet: 1500, Jumbo: 9000)")
+    log_event('input.prompt',
+              "\n[3] Maximum Transmission Unit (MTU)\n"
+              "    Purpose: Set maximum frame size for the interface\n"
+              "    Valid range: 64-9216 bytes (Standard Ethernet: 1500, Jumbo: 9000)")
     while True:
+        flush_logging()
         mtu_input = input("    Enter MTU value [default: 1500]: ").strip()
         if not mtu_input:
             mtu_value = 1500
@@ -594,57 +1906,73 @@ def main():
             mtu_value = int(mtu_input)
             if 64 <= mtu_value <= 9216:
                 break
-            print("    ⚠ MTU must be between 64 and 9216")
+            log_event('input.invalid', "    ⚠ MTU must be between 64 and 9216", logging.WARNING)
         except ValueError:
-            print("    ⚠ Please enter a valid number")
+            log_event('input.invalid', "    ⚠ Please enter a valid number", logging.WARNING)
     
-    print("\n" + "="*70)
-    print("Configuration Summary")
-    print("="*70)
-    print(f"  Interface: {INTERFACE_NAME}")
-    print(f"  Description: '{description_input}'")
-    print(f"  State: {'Enabled (no shutdown)' if not shutdown_value else 'Disabled (shutdown)'}")
-    print(f"  MTU: {mtu_value} bytes")
-    print("="*70)
+    log_event('input.summary',
+              "\n" + "="*70 + "\n"
+              "Configuration Summary\n" +
+              "="*70 + "\n"
+              f"  Interface: {INTERFACE_NAME}\n"
+              f"  Description: '{description_input}'\n"
+              f"  State: {'Enabled (no shutdown)' if not shutdown_value else 'Disabled (shutdown)'}\n"
+              f"  MTU: {mtu_value} bytes\n" +
+              "="*70,
+              interface=INTERFACE_NAME, description=description_input,
+              shutdown=shutdown_value, mtu=mtu_value)
     
+    flush_logging()
     confirm = input("\nProceed with these changes? [Y/n]: ").strip().lower()
     if confirm and confirm not in ['y', 'yes']:
-        print("\n⚠ Configuration changes cancelled by user")
+        log_event('run.cancelled', "\n⚠ Configuration changes cancelled by user", logging.WARNING)
         connection.close_session()
         return
     
     changes_made = []
     
+    # With a change queue configured, the service merges our changes with other
+    # operators' pending requests for this device and commits them together
+    queued = None
+    if CHANGE_QUEUE_URL:
+        queued = submit_interface_changes(description_input, shutdown_value, mtu_value)
+    
     # Change 1: Description
-    print("\nCHANGE 1 of 3:")
-    if change_interface_description(connection, description_input):
+    log_event('run.change', "\nCHANGE 1 of 3:", change=1)
+    if queued['description'] if queued else change_interface_description(connection, description_input):
         changes_made.append(f"Interface description: '{description_input}'")
     
     # Change 2: Interface state
-    print("\nCHANGE 2 of 3:")
-    state_success = shutdown_interface(connection, shutdown=shutdown_value)
+    log_event('run.change', "\nCHANGE 2 of 3:", change=2)
+    state_success = queued['shutdown'] if queued else shutdown_interface(connection, shutdown=shutdown_value)
     # Track the change attempt
     state_text = 'disabled (shutdown)' if shutdown_value else 'enabled (no shutdown)'
     if state_success:
         changes_made.append(f"Interface {INTERFACE_NAME} {state_text}")
+        # Confirm from operational state that the enabled interface came up
+        if not shutdown_value and VERIFY_OPER_TIMEOUT:
+            if verify_interface_up(connection, INTERFACE_NAME, timeout=VERIFY_OPER_TIMEOUT):
+                changes_made.append(f"Interface {INTERFACE_NAME} verified up and passing traffic")
     else:
         changes_made.append(f"Interface state: Not supported on this platform (attempted {state_text})")
-        print("  Note: State change not available on this DevNet sandbox")
+        log_event('run.note', "  Note: State change not available on this DevNet sandbox")
     
     # Change 3: MTU
-    print("\nCHANGE 3 of 3:")
-    mtu_success = change_interface_mtu(connection, mtu_value)
+    log_event('run.change', "\nCHANGE 3 of 3:", change=3)
+    mtu_success = queued['mtu'] if queued else change_interface_mtu(connection, mtu_value)
     # Always add to changes list (track attempts for demo/educational purposes)
     if mtu_success:
         changes_made.append(f"Interface MTU set to {mtu_value} bytes")
     else:
         changes_made.append(f"Interface MTU: Not supported on this platform (attempted {mtu_value} bytes)")
-        print("  Note: MTU change not available on this DevNet sandbox")
+        log_event('run.note', "  Note: MTU change not available on this DevNet sandbox")
     
     # Step 4: Get AFTER configuration
-    print("\n" + "─"*70)
-    print("STEP 3: Verify New Running Configuration (AFTER)")
-    print("─"*70)
+    log_event('run.step',
+              "\n" + "─"*70 + "\n"
+              "STEP 3: Verify New Running Configuration (AFTER)\n" +
+              "─"*70,
+              step=3)
     config_after = get_running_config(connection, save_as='config_after.xml', create_backup=True)
     interface_config_after = get_interface_config(connection)
     
@@ -652,62 +1980,66 @@ def main():
     after_values = extract_interface_values(config_after if config_after else interface_config_after)
     
     # Display Before/After Comparison
-    print("\n" + "="*70)
-    print("BEFORE vs AFTER CONFIGURATION COMPARISON")
-    print("="*70)
+    comparison = ("\n" + "="*70 + "\n"
+                  "BEFORE vs AFTER CONFIGURATION COMPARISON\n" +
+                  "="*70 + "\n")
 
     # Show comparison with last run if available
     if last_run_values:
-        print("\n[PREVIOUS RUN'S BEFORE STATE]")
-        print(f"   Description: {last_run_values['description']}")
-        print(f"   State: {last_run_values['state']}")
-        print(f"   MTU: {last_run_values['mtu']}")
-        print()
-
-    print(f"\nInterface: {INTERFACE_NAME}\n")
-    print(f"[1] Description:")
-    print(f"    BEFORE: {before_values['description']}")
-    print(f"    AFTER:  {description_input}")
-    print(f"    Status: CHANGED\n")
-    
-    print(f"[2] Interface State:")
-    print(f"    BEFORE: {before_values['state']}")
+        comparison += ("\n[PREVIOUS RUN'S BEFORE STATE]\n"
+                       f"   Description: {last_run_values['description']}\n"
+                       f"   State: {last_run_values['state']}\n"
+                       f"   MTU: {last_run_values['mtu']}\n"
+                       "\n")
+
+    comparison += (f"\nInterface: {INTERFACE_NAME}\n\n"
+                   f"[1] Description:\n"
+                   f"    BEFORE: {before_values['description']}\n"
+                   f"    AFTER:  {description_input}\n"
+                   f"    Status: CHANGED\n\n")
+    
+    comparison += (f"[2] Interface State:\n"
+                   f"    BEFORE: {before_values['state']}\n")
     after_state_display = 'Enabled (no shutdown)' if not shutdown_value else 'Disabled (shutdown)'
     if state_success:
         # Successfully changed - show the actual new state from device
-        print(f"    AFTER:  {after_values['state']}")
-        print(f"    Status: {'CHANGED' if before_values['state'] != after_values['state'] else 'NO CHANGE'}\n")
+        comparison += (f"    AFTER:  {after_values['state']}\n"
+                       f"    Status: {'CHANGED' if before_values['state'] != after_values['state'] else 'NO CHANGE'}\n\n")
     else:
         # Change not supported - show what was attempted and current state
-        print(f"    ATTEMPTED: {after_state_display}")
-        print(f"    ACTUAL:    {after_values['state']} (change not supported by sandbox)")
-        print(f"    Status: NOT SUPPORTED ON THIS SANDBOX\n")
+        comparison += (f"    ATTEMPTED: {after_state_display}\n"
+                       f"    ACTUAL:    {after_values['state']} (change not supported by sandbox)\n"
+                       f"    Status: NOT SUPPORTED ON THIS SANDBOX\n\n")
 
-    print(f"[3] MTU Configuration:")
-    print(f"    BEFORE: {before_values['mtu']}")
+    comparison += (f"[3] MTU Configuration:\n"
+                   f"    BEFORE: {before_values['mtu']}\n")
     if mtu_success:
-        after_mtu = f"{mtu_value} bytes"
         # Successfully changed - show the actual new MTU from device
-        print(f"    AFTER:  {after_values['mtu']}")
-        print(f"    Status: {'CHANGED' if str(mtu_value) not in before_values['mtu'] else 'NO CHANGE'}\n")
+        comparison += (f"    AFTER:  {after_values['mtu']}\n"
+                       f"    Status: {'CHANGED' if str(mtu_value) not in before_values['mtu'] else 'NO CHANGE'}\n\n")
     else:
         # Change not supported - show what was attempted and current state
-        print(f"    ATTEMPTED: {mtu_value} bytes")
-        print(f"    ACTUAL:    {after_values['mtu']} (change not supported by sandbox)")
-        print(f"    Status: NOT SUPPORTED ON THIS SANDBOX\n")
-    
-    print("="*70)
-    print(f"\nTotal Successful Changes: {len([c for c in changes_made if 'Not supported' not in c])}")
-    print(f"Configuration files saved:")
-    print(f"   - config_before.xml")
-    print(f"   - config_after.xml")
-    print(f"\nNote: This DevNet sandbox only allows description changes via NETCONF.")
-    print("="*70 + "\n")
+        comparison += (f"    ATTEMPTED: {mtu_value} bytes\n"
+                       f"    ACTUAL:    {after_values['mtu']} (change not supported by sandbox)\n"
+                       f"    Status: NOT SUPPORTED ON THIS SANDBOX\n\n")
+    
+    successful_changes = len([c for c in changes_made if 'Not supported' not in c])
+    comparison += ("="*70 + "\n"
+                   f"\nTotal Successful Changes: {successful_changes}\n"
+                   f"Configuration files saved:\n"
+                   f"   - config_before.xml\n"
+                   f"   - config_after.xml\n"
+                   f"\nNote: This DevNet sandbox only allows description changes via NETCONF.\n" +
+                   "="*70 + "\n")
+    log_event('interface.comparison', comparison, interface=INTERFACE_NAME,
+              before=before_values, after=after_values, successful_changes=successful_changes)
     
     # Step 5: Send notification
-    print("\n" + "─"*70)
-    print("STEP 4: Send Notification to WebEx Teams")
-    print("─"*70)
+    log_event('run.step',
+              "\n" + "─"*70 + "\n"
+              "STEP 4: Send Notification to WebEx Teams\n" +
+              "─"*70,
+              step=4)
     
     notification_message = f"""
 Network Configuration Update Alert
@@ -744,32 +2076,38 @@ Status: Successfully Completed
     send_webex_notification(notification_message)
     
     # Close connection
-    print(f"\n[{datetime.now().strftime('%H:%M:%S')}] Closing connection...")
+    log_event('disconnect.start', f"\n[{_clock()}] Closing connection...")
     connection.close_session()
-    print("✓ Connection closed")
+    log_event('disconnect.ok', "✓ Connection closed")
     
     # Summary
-    print("\n" + "="*70)
-    print("                    AUTOMATION COMPLETE")
-    print("="*70)
-    print(f"  ✓ Total changes made: {len(changes_made)}")
-    print(f"  ✓ Configuration verified (before & after)")
-    print(f"  ✓ Team notification sent")
-    print(f"  ✓ NETCONF session closed properly")
-    print("="*70 + "\n")
-    
-    print("\nSummary of Changes:")
-    for i, change in enumerate(changes_made, 1):
-        print(f"  {i}. {change}")
-    print()
+    log_event('run.complete',
+              "\n" + "="*70 + "\n"
+              "                    AUTOMATION COMPLETE\n" +
+              "="*70 + "\n"
+              f"  ✓ Total changes made: {len(changes_made)}\n"
+              f"  ✓ Configuration verified (before & after)\n"
+              f"  ✓ Team notification sent\n"
+              f"  ✓ NETCONF session closed properly\n" +
+              "="*70 + "\n"
+              "\nSummary of Changes:\n" +
+              "".join(f"  {i}. {change}\n" for i, change in enumerate(changes_made, 1)),
+              changes=changes_made)
 
 
 # ============ RUN THE SCRIPT ============
 if __name__ == "__main__":
     try:
-        main()
+        if sys.argv[1:] == ['serve-queue']:
+            serve_change_queue()
+        else:
+            main()
     except KeyboardInterrupt:
-        print("\n\n⚠ Script interrupted by user")
+        log_event('run.interrupted', "\n\n⚠ Script interrupted by user", logging.WARNING)
     except Exception as e:
-        print(f"\n\n✗ Unexpected error: {e}")
-        print("Please check your configuration and try again")
\ No newline at end of file
+        log_event('run.error',
+                  f"\n\n✗ Unexpected error: {e}\n"
+                  "Please check your configuration and try again",
+                  logging.ERROR, error=str(e))
+    finally:
+        shutdown_logging()